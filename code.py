@@ -23,6 +23,7 @@ saber_led_manager = None
 sensor_manager = None
 prop_wing_enabled = False
 prop_wing_enable_pin = None
+button_alarm = None
 
 def initialize_lightsaber():
     """Initialize all lightsaber components - replaces __init__ method"""
@@ -38,6 +39,7 @@ def initialize_lightsaber():
     
     # Initialize other managers
     sound_manager = SoundManager()
+    sound_manager.initialize(power_state_machine)
     led_manager = LEDManager()
     saber_led_manager = SaberLEDManager()
     sensor_manager = SensorManager()
@@ -58,6 +60,17 @@ def handle_deep_sleep_recovery():
     except Exception as e:
         print(f"Deep sleep recovery error: {e}")
 
+def get_button_alarm():
+    """
+    Get the power button wake-up alarm, reused for every sleep. PinAlarm
+    requires a free pin, so it is created on the first sleep, once the sensor
+    manager has released the pin
+    """
+    global button_alarm
+    if button_alarm is None:
+        button_alarm = alarm.pin.PinAlarm(pin=config.POWER_BUTTON_PIN, value=False, pull=True)
+    return button_alarm
+
 def should_enter_light_sleep():
     """Check if we should enter sleep mode based on inactivity timeout"""
     if power_state_machine.current_state == power_state_machine.SLEEPING:
@@ -68,18 +81,15 @@ def should_enter_light_sleep():
 
 def enter_light_sleep_mode():
     """Enter deep sleep mode when inactivity timeout is reached"""    
-    # Release the power button pin for alarm use
+    # Release the power button pin for alarm use; this returns once the pin is free
     sensor_manager.release_power_button_pin()
-    # Small delay to ensure pin is fully released
-    time.sleep(0.1)
     
     print("Entering light sleep mode")
-    # Create button alarm for wake-up on power button pin
-    button_alarm = alarm.pin.PinAlarm(pin=config.POWER_BUTTON_PIN, value=False, pull=True)
+    # Only the timeout alarm changes between sleeps; the button alarm is reused
     timeout_alarm = alarm.time.TimeAlarm(monotonic_time=time.monotonic() + config.LIGHT_SLEEP_TIMEOUT)
     
     # Exit program and enter deep sleep
-    alarm_result = alarm.light_sleep_until_alarms(button_alarm, timeout_alarm)
+    alarm_result = alarm.light_sleep_until_alarms(get_button_alarm(), timeout_alarm)
 
     if alarm_result == timeout_alarm:
         return False # Timeout occurred, we should enter deep sleep
@@ -87,24 +97,19 @@ def enter_light_sleep_mode():
 
 def enter_deep_sleep_mode():
     """Enter deep sleep mode when inactivity timeout is reached"""    
-    # Release the power button pin for alarm use
+    # Release the power button pin for alarm use; this returns once the pin is free
     sensor_manager.release_power_button_pin()
-    # Small delay to ensure pin is fully released
-    time.sleep(0.1)
     
     print("Entering deep sleep due to inactivity timeout")
     try:
-        # Create button alarm for wake-up on power button pin
-        button_alarm = alarm.pin.PinAlarm(pin=config.POWER_BUTTON_PIN, value=False, pull=True)
-        
         # Exit program and enter deep sleep
-        alarm.exit_and_deep_sleep_until_alarms(button_alarm)
+        alarm.exit_and_deep_sleep_until_alarms(get_button_alarm())
     except Exception as e:
         print(f"Deep sleep error: {e}")
         # Fallback to light sleep if deep sleep fails
         try:
-            button_alarm = alarm.pin.PinAlarm(pin=config.POWER_BUTTON_PIN, value=False)
-            alarm.light_sleep_until_alarms(button_alarm)
+            fallback_alarm = alarm.pin.PinAlarm(pin=config.POWER_BUTTON_PIN, value=False)
+            alarm.light_sleep_until_alarms(fallback_alarm)
             print("Fell back to light sleep, reloading")
             supervisor.reload()
         except Exception as e2:
@@ -150,16 +155,19 @@ def main_loop():
 
         if new_state.power_state == power_state_machine.WAKING:
             set_prop_wing_power(True)
-        elif new_state.power_state in [power_state_machine.SLEEPING]:
+        elif new_state.power_state == power_state_machine.SLEEPING:
             set_prop_wing_power(False)
         
+        # Check if we should enter sleep mode AFTER state machine update; checked
+        # once per tick since both uses below need the same answer
+        light_sleep_due = should_enter_light_sleep()
+        
         # Restore power button pin if we're no longer in sleep mode and pin is not restored
-        if (not should_enter_light_sleep() and 
+        if (not light_sleep_due and 
             sensor_manager.power_button_pin is None):
             sensor_manager.restore_power_button_pin()
         
-        # Check if we should enter sleep mode AFTER state machine update
-        if should_enter_light_sleep():
+        if light_sleep_due:
             #give the logger a chance before we go to sleep
             new_state = logging_manager.process_tick(old_state, new_state, power_state_machine, sound_manager, saber_led_manager)
 
@@ -177,6 +185,7 @@ def main_loop():
             new_state = led_manager.process_tick(old_state, new_state, power_state_machine)
             new_state = saber_led_manager.process_tick(old_state, new_state, power_state_machine)
             new_state = sound_manager.process_tick(old_state, new_state, power_state_machine, saber_led_manager)
+            sound_manager.service_audio()
             
             # Process logging at the end of the tick (skip during wake and activation)
             new_state = logging_manager.process_tick(old_state, new_state, power_state_machine, sound_manager, saber_led_manager)
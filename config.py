@@ -14,15 +14,13 @@ SOUND_EFFECTS = {
     'deactivating':[
         ('off', get_wav_duration('off'))
     ],
+    # Hit and swing playlists cycle through their entries; add a
+    # ('name', get_wav_duration('name')) entry for each extra sounds/name.wav
     'hit':[
-        ('hit', get_wav_duration('hit')),
-        ('hit2', get_wav_duration('hit2')),
-        ('hit3', get_wav_duration('hit3'))
+        ('hit', get_wav_duration('hit'))
     ],
     'swing':[
-        ('swing', get_wav_duration('swing')),
-        ('swing2', get_wav_duration('swing2')),
-        ('swing3', get_wav_duration('swing3'))
+        ('swing', get_wav_duration('swing'))
     ],
     'idle':[
         ('idle', get_wav_duration('idle'))
@@ -224,6 +222,8 @@ ACTIVITY_BUTTON_LED_ANIMATIONS = {
 }
 
 # Sensitivity thresholds - smaller numbers = more sensitive to motion
+# Units are (m/s^2)^2: compared directly against the squared acceleration magnitude,
+# so no square root is ever needed (350 ~= 18.7 m/s^2, 125 ~= 11.2 m/s^2)
 HIT_THRESHOLD = 350
 SWING_THRESHOLD = 125
 
@@ -234,16 +234,20 @@ MOTION_FILTER_WINDOW_SIZE = 5  # Moving average window size for noise reduction
 HIT_DURATION = 0.46  # How long the hit effect lasts (white flash)
 SWING_DURATION = 0.31  # How long the swing effect lasts
 
+PIN_RELEASE_TIMEOUT = 0.2  # Max time to wait for a released pin to become free (seconds)
+
 PROP_WING_PIN = board.D10  # Pin that controls power to the prop wing board
 
 VOLTAGE_MONITOR_PIN = board.VOLTAGE_MONITOR  # Battery voltage monitoring
 
-DEBOUNCE_TIME = 0.2
+DEBOUNCE_TIME = 0.2  # Button debounce time, converted to per-button sample counts below
 LONG_PRESS_TIME = 0.5  # Time for long press detection
 DOUBLE_PRESS_TIMEOUT = 0.5  # Maximum time between presses for double-press detection
 ACCEL_READ_INTERVAL = 0.005  # 200Hz max for accelerometer reading (improved swing detection)
 BATTERY_READ_INTERVAL = 60.0  # Read battery voltage once per 60 seconds
 STATE_LOG_INTERVAL = 30.0  # Log state every 30 seconds
+RAM_SOUND_MAX_BYTES = 32768  # Sounds with at most this much sample data are kept in RAM instead of streamed
+RAM_SOUND_TOTAL_BYTES = 65536  # Total sample data kept in RAM across all sounds; the rest stream from flash
 
 # Power state machine settings
 ENABLE_DEEP_SLEEP = False  # Enable deep sleep mode (set to False to use light sleep only)
@@ -256,4 +260,13 @@ WAKING_DURATION = 0.1  # 100ms delay for WAKING state to stabilize before activa
 # Main loop timing
 ACTIVE_TICK_DELAY = 0.01  # Fast response for active states (10ms)
 IDLE_TICK_DELAY = 0.01     # Slower response for idle state (1ms) - power saving
-SLEEPING_TICK_DELAY = 0.1  # Reduced sleep interval for SLEEPING state
\ No newline at end of file
+SLEEPING_TICK_DELAY = 0.1  # Reduced sleep interval for SLEEPING state
+
+# Debouncing counts consecutive stable samples, one per main loop tick, so the
+# effective debounce time is the sample count times the current tick delay.
+# The activity button is only used while ACTIVE/IDLE, so it gets DEBOUNCE_TIME
+# at ACTIVE_TICK_DELAY (200ms). The power button must wake the saber from
+# SLEEPING, so it gets DEBOUNCE_TIME at SLEEPING_TICK_DELAY (200ms while
+# SLEEPING, 20ms at ACTIVE_TICK_DELAY)
+ACTIVITY_BUTTON_DEBOUNCE_SAMPLES = max(1, round(DEBOUNCE_TIME / ACTIVE_TICK_DELAY))
+POWER_BUTTON_DEBOUNCE_SAMPLES = max(1, round(DEBOUNCE_TIME / SLEEPING_TICK_DELAY))
\ No newline at end of file
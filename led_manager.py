@@ -8,7 +8,11 @@ import config
 from lightsaber_state import LightsaberState
 from rgb_led import RGBLED, OnOffLed
 from led_utils import LEDAnimationManager, create_animation_from_config
-from state_machines.power_state_machine import PowerStateMachineState
+from state_machines.power_state_machine import POWER_STATE_NAMES, get_power_state_name
+
+# Lowercase animation config keys indexed by power state, built once so the
+# tick doesn't allocate a new lowercased name for every LED
+_POWER_STATE_KEYS = tuple(name.lower() for name in POWER_STATE_NAMES)
 
 class LEDManager:
     """Manages button LED and built-in LED state management for the lightsaber"""
@@ -84,7 +88,10 @@ class LEDManager:
         """
        
         # Get the animation key for this power state
-        animation_key = PowerStateMachineState.get_state_name(power_state).lower()
+        if 0 <= power_state < len(_POWER_STATE_KEYS):
+            animation_key = _POWER_STATE_KEYS[power_state]
+        else:
+            animation_key = get_power_state_name(power_state).lower()
         
         # Get the appropriate animation based on type
         if animation_type == 'builtin_pixel':
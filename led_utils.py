@@ -152,6 +152,10 @@ def get_animation_index_from_nvm():
 def save_animation_index_to_nvm(animation_index):
     """Save animation index to NVM"""
     try:
+        # NVM writes are slow and wear the flash, so skip them when the byte
+        # already holds this index
+        if microcontroller.nvm[0] == animation_index:
+            return
         # Store the animation index as a single byte
         microcontroller.nvm[0] = animation_index
         print(f"Saved animation index {animation_index} to NVM")
@@ -26,8 +26,8 @@ class LoggingManager:
         """Log state transitions for debugging and monitoring"""
         try:
             # Check for power state transitions
+            # LightsaberState always initializes power_state, so no hasattr probe is needed
             if (power_state_machine and 
-                hasattr(new_state, 'power_state') and 
                 new_state.power_state != self.last_power_state):
                 
                 old_power_name = power_state_machine.get_state_name(self.last_power_state) if self.last_power_state is not None else "UNKNOWN"
@@ -90,10 +90,9 @@ class LoggingManager:
 
             # Get audio state from sound manager
             if sound_manager:
-                effect_sound = sound_manager.effect_sound
-                effect_playing = effect_sound is not None and effect_sound[1] if effect_sound else False
-                effect_name = effect_sound[0] if effect_sound else 'None'
-                idle_sound_open = sound_manager.idle_sound is not None
+                effect_playing = sound_manager.effect_active
+                effect_name = sound_manager.effect_name or 'None'
+                idle_sound_open = sound_manager.idle_wave is not None
                 audio_playing = sound_manager.is_playing()
             else:
                 effect_playing = False
@@ -46,6 +46,8 @@ class SaberLEDManager:
 
         self.activation_lock = None
         self.deactivation_lock = None
+        # Power state seen on the previous tick; lock cleanup only runs when it changes
+        self._prev_power_state = None
     
     def get_animation_index(self):
         """Get the current animation index"""
@@ -152,15 +154,12 @@ class SaberLEDManager:
 
     def _handle_activation_state(self, new_state, power_state_machine):
         """Handle saber LED behavior for ACTIVATING state with state lock management"""
-        # Get the current activation duration from the state
-        activation_duration = new_state.get_current_sound_duration('activating')
-        if activation_duration <= 0:
-            # Fallback to first activation sound duration if state doesn't have it yet
-            activation_effects = config.SOUND_EFFECTS.get('activating', [])
-            if activation_effects:
-                activation_duration = activation_effects[0][1]
-            else:
-                activation_duration = 2.0  # Default fallback
+        # The activation sound always starts from the first entry of its playlist
+        activation_effects = config.SOUND_EFFECTS.get('activating', [])
+        if activation_effects:
+            activation_duration = activation_effects[0][1]
+        else:
+            activation_duration = 2.0  # Default fallback
         
         # Create and add state lock for activation sound if not already created
         if self.activation_lock is None:
@@ -200,15 +199,12 @@ class SaberLEDManager:
     
     def _handle_deactivation_state(self, new_state, power_state_machine):
         """Handle saber LED behavior for DEACTIVATING state with state lock management"""
-        # Get the current deactivation duration from the state
-        deactivation_duration = new_state.get_current_sound_duration('deactivating')
-        if deactivation_duration <= 0:
-            # Fallback to first deactivation sound duration if state doesn't have it yet
-            deactivation_effects = config.SOUND_EFFECTS.get('deactivating', [])
-            if deactivation_effects:
-                deactivation_duration = deactivation_effects[0][1]
-            else:
-                deactivation_duration = 2.0  # Default fallback
+        # The deactivation sound always starts from the first entry of its playlist
+        deactivation_effects = config.SOUND_EFFECTS.get('deactivating', [])
+        if deactivation_effects:
+            deactivation_duration = deactivation_effects[0][1]
+        else:
+            deactivation_duration = 2.0  # Default fallback
         
         # Create and add state lock for activation sound if not already created
         if self.deactivation_lock is None:
@@ -243,31 +239,36 @@ class SaberLEDManager:
 
     def process_tick(self, old_state, new_state, power_state_machine=None):
         """Process one tick of saber LED management based on state transitions"""
+        # Bind the state constants and this tick's power state once as locals
+        ACTIVATING = power_state_machine.ACTIVATING
+        DEACTIVATING = power_state_machine.DEACTIVATING
+        power_state = new_state.power_state
+        
+        # Lock cleanup only happens on the tick the power state changes, so
+        # steady-state ticks skip the transition checks entirely
+        old_power_state = self._prev_power_state
+        if power_state != old_power_state:
+            self._prev_power_state = power_state
+            if old_power_state == ACTIVATING and self.activation_lock:
+                # Clean up activation lock if transitioning away from ACTIVATING
+                print("Transitioning away from ACTIVATING - cleaning up activation lock")
+                self.activation_lock.unlock()
+                power_state_machine.remove_state_lock_obj(self.activation_lock)
+                self.activation_lock = None
+            elif old_power_state == DEACTIVATING and self.deactivation_lock:
+                # Clean up deactivation lock if transitioning away from DEACTIVATING
+                print("Transitioning away from DEACTIVATING - cleaning up deactivation lock")
+                self.deactivation_lock.unlock()
+                power_state_machine.remove_state_lock_obj(self.deactivation_lock)
+                self.deactivation_lock = None
         
         # Handle power state machine integration
-        if new_state.power_state == power_state_machine.ACTIVATING:
+        if power_state == ACTIVATING:
             self._handle_activation_state(new_state, power_state_machine)
-        elif (old_state.power_state == power_state_machine.ACTIVATING and 
-            new_state.power_state != power_state_machine.ACTIVATING and 
-            self.activation_lock):
-            # Clean up activation lock if transitioning away from ACTIVATING
-            print("Transitioning away from ACTIVATING - cleaning up activation lock")
-            self.activation_lock.unlock()
-            power_state_machine.remove_state_lock("activation_saber_animation")
-            self.activation_lock = None
-
-        if new_state.power_state == power_state_machine.DEACTIVATING:
+        elif power_state == DEACTIVATING:
             self._handle_deactivation_state(new_state, power_state_machine)
-        elif (old_state.power_state == power_state_machine.DEACTIVATING and 
-            new_state.power_state != power_state_machine.DEACTIVATING and 
-            self.deactivation_lock):
-            # Clean up deactivation lock if transitioning away from DEACTIVATING
-            print("Transitioning away from DEACTIVATING - cleaning up deactivation lock")
-            self.deactivation_lock.unlock()
-            power_state_machine.remove_state_lock("deactivation_saber_animation")
-            self.deactivation_lock = None
 
-        if new_state.power_state == power_state_machine.ACTIVE:
+        if power_state == power_state_machine.ACTIVE:
             # Handle motion events
             if new_state.has_event(new_state.HIT_START) or self.saber_effect == 'hit':
                 self._handle_hit_state(new_state)
@@ -1,16 +1,20 @@
 """Sensor management module for the lightsaber"""
 
 import time
-import math
 import busio
 import board
 from digitalio import DigitalInOut, Direction, Pull
 from analogio import AnalogIn
 import adafruit_lis3dh
-from adafruit_debouncer import Button, Debouncer
 import config
 from lightsaber_state import LightsaberState
 
+# Events emitted for motion transitions that produce more than one event,
+# resolved once at import time
+HIT_TO_SWING_EVENTS = (LightsaberState.HIT_STOP, LightsaberState.SWING_START)
+HIT_TO_IDLE_EVENTS = (LightsaberState.HIT_STOP, LightsaberState.IDLE_START)
+SWING_TO_IDLE_EVENTS = (LightsaberState.SWING_STOP, LightsaberState.IDLE_START)
+
 class MotionFilter:
     """Simple moving average filter for accelerometer data"""
     
@@ -31,6 +35,50 @@ class MotionFilter:
         
         return avg_x, avg_y, avg_z
 
+class StableSampleDebouncer:
+    """Debounce a boolean input by requiring N consecutive stable samples"""
+    
+    def __init__(self, read_sample, samples=3):
+        """
+        Initialize the debouncer
+        
+        Args:
+            read_sample: Callable returning the raw boolean input value
+            samples (int): Number of consecutive matching samples before the value changes
+        """
+        self.read_sample = read_sample
+        self.samples = samples
+        self.candidate = False
+        self.counter = 0
+        self.value = False
+        self.rose = False
+        self.fell = False
+        self.last_change_time = 0.0
+    
+    def update(self):
+        """Take one sample and update the debounced value and edge flags"""
+        sample = self.read_sample()
+        self.rose = False
+        self.fell = False
+        if sample == self.candidate:
+            if self.counter < self.samples:
+                self.counter += 1
+        else:
+            # A new candidate value is itself the first stable sample
+            self.candidate = sample
+            self.counter = 1
+        if self.counter >= self.samples and sample != self.value:
+            self.value = sample
+            self.rose = sample
+            self.fell = not sample
+            # Only timestamp on transitions, used for long-press detection
+            self.last_change_time = time.monotonic()
+    
+    @property
+    def current_duration(self):
+        """Seconds since the debounced value last changed"""
+        return time.monotonic() - self.last_change_time
+
 class SensorManager:
     """Manages all sensor inputs including accelerometer, buttons, and battery monitoring"""
     
@@ -50,15 +98,15 @@ class SensorManager:
         # Activity button with analog input and debouncing
         self.activity_pin = AnalogIn(config.ACTIVITY_PIN)
         # Create a debouncer with a lambda that reads analog value and compares to threshold
-        self.activity_button = Debouncer(
+        self.activity_button = StableSampleDebouncer(
             lambda: self.activity_pin.value > config.ACTIVITY_BUTTON_THRESHOLD,
-            interval=config.DEBOUNCE_TIME
+            samples=config.ACTIVITY_BUTTON_DEBOUNCE_SAMPLES
         )
         
         self._initialize_power_button_pin()
         
-        # Battery voltage monitoring - initialize once in constructor
-        self.vbat_voltage = AnalogIn(config.VOLTAGE_MONITOR_PIN)
+        # Battery voltage monitoring - ADC channel is created on first read
+        self.vbat_voltage = None
         
         # Accelerometer - with error handling for missing board
         try:
@@ -88,7 +136,11 @@ class SensorManager:
                 power_button_pin = DigitalInOut(config.POWER_BUTTON_PIN)
                 power_button_pin.direction = Direction.INPUT
                 power_button_pin.pull = Pull.UP
-                self.power_button = Button(power_button_pin)
+                # Button is active-low (pulled up), so pressed reads as False
+                self.power_button = StableSampleDebouncer(
+                    lambda: not power_button_pin.value,
+                    samples=config.POWER_BUTTON_DEBOUNCE_SAMPLES
+                )
                 self.power_button_pin = power_button_pin
         except Exception as e:
             print(f"Error initializing power button pin: {e}")
@@ -113,9 +165,11 @@ class SensorManager:
         """Get battery voltage reading with rate limiting"""
         now = time.monotonic()
         
-        # Force read on boot (when last_battery_read is 0) or when interval has elapsed
-        if new_state.last_battery_read == 0.0 or (now - new_state.last_battery_read >= config.BATTERY_READ_INTERVAL):
+        # Read when the interval has elapsed (the initial state makes this true on boot)
+        if now - new_state.last_battery_read >= config.BATTERY_READ_INTERVAL:
             try:
+                if self.vbat_voltage is None:
+                    self.vbat_voltage = AnalogIn(config.VOLTAGE_MONITOR_PIN)
                 # Convert ADC reading to voltage
                 # Formula: (ADC_value * 3.3V) / 65536 * 2 (voltage divider)
                 voltage = (self.vbat_voltage.value * 3.3) / 65536 * 2
@@ -128,11 +182,6 @@ class SensorManager:
         # Return the cached value
         return new_state.battery_voltage
     
-    def _update_sensor_readings(self, new_state):
-        """Update sensor readings for the current tick"""
-        new_state.cached_acceleration = self.get_acceleration_cached(new_state)
-        new_state.battery_voltage = self.get_battery_voltage(new_state)
-    
     def _process_power_button(self, old_state, new_state):
         """Process power button events and state updates with double-press detection"""
         # Initialize power button pin if not already initialized
@@ -142,7 +191,7 @@ class SensorManager:
         self.power_button.update()
         
         # Set button pressed state (only if power button is initialized)
-        new_state.power_button_pressed = self.power_button.pressed
+        new_state.power_button_pressed = self.power_button.rose
         
         current_time = time.monotonic()
         
@@ -203,12 +252,12 @@ class SensorManager:
             pass
             new_state.add_event(new_state.ACTIVITY_BUTTON_SHORT_PRESS)
     
-    def _process_motion_detection(self, old_state, new_state):
+    def _process_motion_detection(self, old_state, new_state, acceleration):
         """Process motion detection events from accelerometer with improved accuracy"""
         # Detect motion events
         if new_state.swing_hit_state != new_state.OFF:
-            acceleration = new_state.cached_acceleration
             if acceleration is not None:
+                add_event = new_state.add_event
                 x, y, z = acceleration
                 
                 # Apply filtering to reduce noise
@@ -218,52 +267,49 @@ class SensorManager:
                 # Using squared values avoids sqrt calculation and matches original thresholds
                 # Original used x*x + z*z, new uses x*x + y*y + z*z for all three axes
                 acceleration_magnitude_squared = filtered_x * filtered_x + filtered_y * filtered_y + filtered_z * filtered_z
-                acceleration_magnitude = math.sqrt(acceleration_magnitude_squared)  # For logging/debugging only
-                
-                # No verbose motion debug logging
                 
                 # Determine current motion state based on acceleration thresholds (using squared values)
                 # Thresholds are calibrated for squared acceleration values (original implementation style)
                 if acceleration_magnitude_squared > config.HIT_THRESHOLD:
                     # HIT: Large acceleration detected
                     if old_state.swing_hit_state != old_state.HIT:
-                        new_state.add_event(new_state.HIT_START)
+                        add_event(new_state.HIT_START)
                         new_state.swing_hit_state = new_state.HIT
                     else:
-                        new_state.add_event(new_state.HIT_IN_PROGRESS)
+                        add_event(new_state.HIT_IN_PROGRESS)
                         new_state.swing_hit_state = new_state.HIT
                         
                 elif acceleration_magnitude_squared > config.SWING_THRESHOLD:
                     # SWING: Moderate acceleration detected
                     if old_state.swing_hit_state == old_state.HIT:
                         # Transitioning from HIT to SWING
-                        new_state.add_event(new_state.HIT_STOP)
-                        new_state.add_event(new_state.SWING_START)
+                        for event in HIT_TO_SWING_EVENTS:
+                            add_event(event)
                         new_state.swing_hit_state = new_state.SWING
                     elif old_state.swing_hit_state == old_state.IDLE:
                         # Starting swing from idle
-                        new_state.add_event(new_state.SWING_START)
+                        add_event(new_state.SWING_START)
                         new_state.swing_hit_state = new_state.SWING
                     elif old_state.swing_hit_state == old_state.SWING:
                         # Continue swinging
-                        new_state.add_event(new_state.SWING_IN_PROGRESS)
+                        add_event(new_state.SWING_IN_PROGRESS)
                         new_state.swing_hit_state = new_state.SWING
                         
                 else:
                     # IDLE: Low acceleration detected
                     if old_state.swing_hit_state == old_state.HIT:
                         # Transitioning from HIT to IDLE
-                        new_state.add_event(new_state.HIT_STOP)
-                        new_state.add_event(new_state.IDLE_START)
+                        for event in HIT_TO_IDLE_EVENTS:
+                            add_event(event)
                         new_state.swing_hit_state = new_state.IDLE
                     elif old_state.swing_hit_state == old_state.SWING:
                         # Transitioning from SWING to IDLE
-                        new_state.add_event(new_state.SWING_STOP)
-                        new_state.add_event(new_state.IDLE_START)
+                        for event in SWING_TO_IDLE_EVENTS:
+                            add_event(event)
                         new_state.swing_hit_state = new_state.IDLE
                     elif old_state.swing_hit_state == old_state.IDLE:
                         # Continue idle
-                        new_state.add_event(new_state.IDLE_IN_PROGRESS)
+                        add_event(new_state.IDLE_IN_PROGRESS)
                         new_state.swing_hit_state = new_state.IDLE
             else:
                 # No verbose logging when acceleration is None
@@ -276,27 +322,47 @@ class SensorManager:
         """Release the power button pin for use by alarm system"""
         try:
             # Deinitialize the Button object first
-            if hasattr(self, 'power_button') and self.power_button:
+            if self.power_button is not None:
                 self.power_button = None
             
             # Then deinitialize the pin and unregister it
-            if hasattr(self, 'power_button_pin') and self.power_button_pin:
+            if self.power_button_pin is not None:
                 # Properly unregister the pin from its current use
                 self.power_button_pin.deinit()
                 self.power_button_pin = None
-        
             
-            # Additional delay to ensure pin is fully released and unregistered
-            time.sleep(0.2)
+            # Wait until the pin is actually free rather than a fixed delay
+            if not self._wait_for_pin_release(config.POWER_BUTTON_PIN, config.PIN_RELEASE_TIMEOUT):
+                print("WARNING: Power button pin still in use after release timeout")
             
             # No verbose logging on release
         except Exception as e:
             print(f"Error releasing power button pin: {e}")
     
+    def _wait_for_pin_release(self, pin, timeout):
+        """
+        Poll until a pin can be claimed again, giving up after timeout seconds
+        
+        Returns:
+            bool: True if the pin is free, False if the timeout was reached
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                probe = DigitalInOut(pin)
+            except ValueError:
+                # Pin is still registered as in use
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+            else:
+                probe.deinit()
+                return True
+    
     def restore_power_button_pin(self):
         """Restore the power button pin after waking from sleep"""
         try:
-            if not self.power_button_pin:
+            if self.power_button_pin is None:
                 self._initialize_power_button_pin()
                 # No verbose logging on restore
         except Exception as e:
@@ -305,8 +371,10 @@ class SensorManager:
     def process_tick(self, old_state, new_state):
         """Process one tick of sensor data and detect events"""
 
-        self._update_sensor_readings(new_state)
+        # Both getters update the cached values on new_state themselves
+        acceleration = self.get_acceleration_cached(new_state)
+        self.get_battery_voltage(new_state)
         self._process_power_button(old_state, new_state)
         self._process_activity_button(old_state, new_state)
-        self._process_motion_detection(old_state, new_state)
+        self._process_motion_detection(old_state, new_state, acceleration)
         return new_state
\ No newline at end of file
@@ -1,13 +1,39 @@
 """Sound management module for the lightsaber"""
 
 import time
+import array
+import struct
 import audioio
 import audiocore
 import board
+from collections import deque
 import config
+from micropython import const
 from lightsaber_state import LightsaberState
 from state_machines.state_machine_base import StateLock
 
+# Set to 1 to print informational sound messages
+_DEBUG = const(0)
+
+# Event bits in LightsaberState.events_mask that drive motion effects
+HIT_START_BIT = 1 << LightsaberState.HIT_START
+SWING_START_BIT = 1 << LightsaberState.SWING_START
+MOTION_START_BITS = HIT_START_BIT | SWING_START_BIT
+
+# Motion effect categories as small ints so the tick compares integers rather
+# than strings; MOTION_EFFECTS maps each id back to its config.SOUND_EFFECTS key
+_HIT_EFFECT = const(0)
+_SWING_EFFECT = const(1)
+MOTION_EFFECTS = ('hit', 'swing')
+
+# Queued audio command meaning 'stop'; play commands are (sample, loop)
+STOP_COMMAND = (None, False)
+
+# Sounds played by name (play_power_on_sound, play_power_off_sound and the idle
+# hum), parsed at startup along with every config.SOUND_EFFECTS entry so
+# triggering them never touches the filesystem
+PRELOADED_SOUNDS = ('on', 'off', 'idle')
+
 class SoundManager:
     """Manages all audio functionality for the lightsaber"""
     
@@ -16,19 +42,200 @@ class SoundManager:
         Initialize the sound manager
         """
         self.audio = audioio.AudioOut(board.A0)
+        # Audio commands queued by the tick handlers and executed by service_audio(),
+        # so AudioOut is only driven from one place in the main loop. Commands
+        # queued outside process_tick (e.g. during WAKING, when the main loop
+        # skips the sound tick) wait for the next service_audio(). A tick queues
+        # at most a stop and a play; past 8 pending commands the oldest is dropped
+        self._commands = deque((), 8)
+        # False once audio.stop() has run and nothing has been played since, so
+        # queued stops don't cross into audioio again when it is already stopped
+        self._audio_running = False
         self.activation_lock = None
         self.deactivation_lock = None
         
         # Audio state tracking (moved from LightsaberState)
-        # effect_sound: tuple of (filename, is_currently_playing)
-        self.effect_sound = None
-        # idle_sound: pointer to the wave file object that stays open
-        self.idle_sound = None
-        # Track when effects started for duration-based completion
-        self.sound_start_time = 0.0
-        # Current sound effect file pointer for cycling
-        self.current_effect_file = None
+        # Name of the current effect sound and whether it is still playing,
+        # kept as two scalars so starting/finishing an effect allocates nothing
+        self.effect_name = None
+        self.effect_active = False
+        # Motion effect category of the running effect (None, _HIT_EFFECT or _SWING_EFFECT)
+        self._current_effect = None
+        # Absolute time.monotonic_ns() the current effect is due to finish, for
+        # duration-based completion; integer ns stay exact where the float
+        # monotonic() loses resolution as uptime grows
+        self.sound_end_ns = 0
+        # True while the idle hum loop is the sound playing; a looped sound only
+        # stops when something else is played or stop_sound() is called
+        self._idle_looping = False
+        # Power state -> tick handler table, filled in initialize() since it
+        # needs the power state machine's state constants; until then every
+        # state is silent
+        self._state_handlers = {}
+        # Power state -> (playlist category, lock) for the transition sounds,
+        # also filled in initialize()
+        self._transition_sounds = {}
+        # Power state seen on the previous tick, so entry/exit edges are found
+        # without reading back through old_state
+        self._prev_power_state = None
         
+        # Sound effect playlists copied out of config once, as tuples, so the tick
+        # handlers don't repeat the module attribute and dict lookups
+        self._effects = {category: tuple(effects) for category, effects in config.SOUND_EFFECTS.items()}
+        
+        # File paths for every known sound, built once instead of per play
+        self._paths = {name: 'sounds/' + name + '.wav' for name in PRELOADED_SOUNDS}
+        for effects in self._effects.values():
+            for effect_name, _ in effects:
+                self._paths[effect_name] = 'sounds/' + effect_name + '.wav'
+        
+        # Short sounds decoded into RAM at boot so triggering them never touches
+        # the filesystem; anything over config.RAM_SOUND_MAX_BYTES, or past the
+        # config.RAM_SOUND_TOTAL_BYTES budget, streams from flash
+        self._ram_waves = {}
+        self._ram_sound_bytes = 0
+        for name in self._paths:
+            sample = self._load_ram_sample(name)
+            if sample is not None:
+                self._ram_waves[name] = sample
+        
+        # Playable samples keyed by sound name: RAM samples where available,
+        # otherwise parsed WaveFile objects whose files stay open for reuse
+        # Load every known sound now so no effect pays the open/parse cost on first use
+        self._wave_cache = {}
+        for name in self._paths:
+            self._load_wave(name)
+        # Drop playlist entries whose file couldn't be loaded so cycling through a
+        # playlist never lands on a silent slot
+        self._effects = {category: tuple(effect for effect in effects if effect[0] in self._wave_cache)
+                         for category, effects in self._effects.items()}
+        # Hit/swing playlists indexed by motion effect id
+        self._motion_effects = tuple(self._effects.get(name, ()) for name in MOTION_EFFECTS)
+        # Playlist position of the next hit/swing sound, indexed by motion effect
+        # id; the sound manager is the only reader, so the cursors live here
+        # rather than on LightsaberState
+        self._cursor = [0, 0]
+        # idle_wave: the parsed idle hum, reused for every (re)start of the loop
+        self.idle_wave = self._wave_cache.get('idle')
+    
+    def initialize(self, power_state_machine):
+        """
+        Finish setup that needs the power state machine; call once before the first tick
+        @param power_state_machine: PowerStateMachine whose transitions the sound locks hold
+        """
+        self._build_state_handlers(power_state_machine)
+        
+        # Build the activation/deactivation locks once; they are re-armed with
+        # lock() on every entry instead of being allocated per transition
+        activation_effects = self._effects.get('activating', ())
+        if activation_effects:
+            self.activation_lock = StateLock(
+                name="activation_sound",
+                blocked=False,
+                timeout=activation_effects[0][1] + 0.5,  # Add small buffer to prevent race conditions
+                valid_states=[power_state_machine.ACTIVATING]
+            )
+        deactivation_effects = self._effects.get('deactivating', ())
+        if deactivation_effects:
+            self.deactivation_lock = StateLock(
+                name="deactivation_sound",
+                blocked=False,
+                timeout=deactivation_effects[0][1] + 0.5,  # Add small buffer to prevent race conditions
+                valid_states=[power_state_machine.DEACTIVATING]
+            )
+        
+        # Power state -> (playlist category, lock) for the two transition sounds,
+        # shared by the tick handler and the entry/exit bookkeeping
+        self._transition_sounds = {
+            power_state_machine.ACTIVATING: ('activating', self.activation_lock),
+            power_state_machine.DEACTIVATING: ('deactivating', self.deactivation_lock)
+        }
+    
+    def _sound_path(self, name):
+        """Get the 'sounds/<name>.wav' path for a sound, building it only for unknown names"""
+        return self._paths.get(name) or 'sounds/' + name + '.wav'
+    
+    def _load_ram_sample(self, name):
+        """
+        Read a small 16-bit PCM 'sounds/<name>.wav' fully into RAM
+        @param name: partial file name string, as for play_wav_filename
+        @return: an audiocore.RawSample, or None if the file is missing, too
+                 large for the RAM budget, not 16-bit PCM or can't be allocated
+                 (it is then played from the file)
+        """
+        try:
+            with open(self._sound_path(name), 'rb') as wav:
+                header = wav.read(12)
+                if header[0:4] != b'RIFF' or header[8:12] != b'WAVE':
+                    return None
+                channel_count = None
+                # Walk the RIFF chunks: 'fmt ' describes the samples, 'data' holds them
+                while True:
+                    chunk = wav.read(8)
+                    if len(chunk) < 8:
+                        return None
+                    size = struct.unpack('<I', chunk[4:8])[0]
+                    if chunk[0:4] == b'fmt ':
+                        fmt = wav.read(size + (size & 1))
+                        audio_format, channel_count, sample_rate = struct.unpack('<HHI', fmt[0:8])
+                        bits_per_sample = struct.unpack('<H', fmt[14:16])[0]
+                        if audio_format != 1 or bits_per_sample != 16:
+                            return None
+                    elif chunk[0:4] == b'data':
+                        if (channel_count is None or size > config.RAM_SOUND_MAX_BYTES or
+                                self._ram_sound_bytes + size > config.RAM_SOUND_TOTAL_BYTES):
+                            return None
+                        # RawSample only plays 16-bit data from an 'h' array (a
+                        # bytearray is taken as 8-bit), so size a zeroed one with
+                        # the array(typecode, bytes) raw-copy constructor, which
+                        # CircuitPython supports, and read the samples straight
+                        # into it. The zero bytes are garbage once it's built; an
+                        # odd trailing data byte is dropped
+                        samples = array.array('h', bytes(size & ~1))
+                        if wav.readinto(samples) != len(samples) * 2:
+                            return None
+                        self._ram_sound_bytes += len(samples) * 2
+                        return audiocore.RawSample(samples, channel_count=channel_count, sample_rate=sample_rate)
+                    else:
+                        # Chunks are padded to an even length
+                        wav.seek(size + (size & 1), 1)
+        except OSError:
+            # Missing file - reported when it is loaded for playback
+            return None
+        except (MemoryError, ValueError):
+            # No room for the samples or a malformed header - stream the file instead
+            return None
+    
+    def _load_wave(self, name):
+        """
+        Get a playable sample for 'sounds/<name>.wav' and store it in the wave cache
+        @param name: partial file name string, as for play_wav_filename
+        @return: the cached RAM sample or WaveFile, or None if the file could not be loaded
+        """
+        wave = self._ram_waves.get(name)
+        if wave is not None:
+            self._wave_cache[name] = wave
+            return wave
+        try:
+            wave = audiocore.WaveFile(open(self._sound_path(name), 'rb'))
+        except Exception as e:
+            print(f"Failed to load sound {name}: {e}")
+            return None
+        self._wave_cache[name] = wave
+        return wave
+        
+    def _get_wave(self, name):
+        """
+        Get the cached sample for a sound, loading it on first use
+        @param name: partial file name string, as for play_wav_filename
+        @return: the cached sample, or None if the file could not be loaded
+        """
+        wave = self._wave_cache.get(name)
+        if wave is None:
+            # Not preloaded - load once and keep it for the next trigger
+            wave = self._load_wave(name)
+        return wave
+    
     def play_wav_filename(self, name, loop=False):
         """
         Play a WAV file in the 'sounds' directory by filename.
@@ -36,16 +243,16 @@ class SoundManager:
                      this, e.g. passing 'foo' will play file 'sounds/foo.wav'.
         @param loop: if True, sound will repeat indefinitely (until interrupted
                      by another sound).
+        @return: True if the sound was queued; it starts at the next service_audio()
         """
-        print("playing", name)
-        try:
-            wave_file = open('sounds/' + name + '.wav', 'rb')
-            wave = audiocore.WaveFile(wave_file)
-            self.audio.play(wave, loop=loop)
-            return True
-        except Exception as e:
-            print(f"Failed to play sound {name}: {e}")
+        if _DEBUG:
+            print("playing", name)
+        wave = self._get_wave(name)
+        if wave is None:
             return False
+        self._idle_looping = False
+        self._commands.append((wave, loop))
+        return True
     
     def play_wav(self, wave_file, loop=False):
         """
@@ -54,9 +261,10 @@ class SoundManager:
         @param loop: if True, sound will repeat indefinitely (until interrupted
                      by another sound).
         """
+        self._idle_looping = False
         try:
             wave = audiocore.WaveFile(wave_file)
-            self.audio.play(wave, loop=loop)
+            self._commands.append((wave, loop))
             return True
         except Exception as e:
             print(f"Failed to play sound from file pointer: {e}")
@@ -64,109 +272,55 @@ class SoundManager:
     
     def stop_sound(self):
         """Stop any currently playing sound"""
-        try:
-            self.audio.stop()
+        self._idle_looping = False
+        self._commands.append(STOP_COMMAND)
+        if _DEBUG:
             print("Sound stopped")
-        except Exception as e:
-            print(f"Failed to stop sound: {e}")
     
     def stop_effect(self):
         """Stop any currently playing effect"""
         self.stop_sound()
-        self.effect_sound = None
-        self._close_current_effect_file()
-        print("Effect stopped")
+        self.effect_name = None
+        self.effect_active = False
+        self._current_effect = None
+        if _DEBUG:
+            print("Effect stopped")
     
-    def _close_current_effect_file(self):
-        """Close the current effect file pointer if it exists"""
-        if self.current_effect_file:
-            try:
-                self.current_effect_file.close()
-                print("Closed current effect file")
-            except Exception as e:
-                print(f"Error closing effect file: {e}")
-            finally:
-                self.current_effect_file = None
-    
-    def play_effect(self, effect_name):
-        """
-        Play a sound effect and update internal state
-        @param effect_name: name of the effect to play
-        """
-        self.effect_sound = (effect_name, True)
-        self.sound_start_time = time.monotonic()
-        return self.play_wav_filename(effect_name)
-    
-    def play_effect_from_playlist(self, effect_name, duration, state=None):
+    def play_effect_from_playlist(self, effect_name, duration, now=None):
         """
-        Play a sound effect from the playlist with proper file management
+        Play a sound effect from the playlist using its cached sample
         @param effect_name: name of the effect to play
         @param duration: duration of the effect in seconds
-        @param state: LightsaberState object to update with current duration
+        @param now: time.monotonic_ns() already read this tick, if the caller has one
         """
-        # Close previous effect file if it exists
-        self._close_current_effect_file()
+        wave = self._get_wave(effect_name)
+        if wave is None:
+            return False
+        self._idle_looping = False
+        self._commands.append((wave, False))
         
-        # Update state with current duration if provided
-        if state is not None:
-            # Don't set global duration anymore - each sound type has its own duration
-            pass
+        self.effect_name = effect_name
+        self.effect_active = True
+        if now is None:
+            now = time.monotonic_ns()
+        self.sound_end_ns = now + int(duration * 1000000000)
         
-        # Open new effect file
-        try:
-            file_path = 'sounds/' + effect_name + '.wav'
-            
-            self.current_effect_file = open(file_path, 'rb')
-            wave = audiocore.WaveFile(self.current_effect_file)
-            self.audio.play(wave, loop=False)
-            
-            self.effect_sound = (effect_name, True)
-            self.sound_start_time = time.monotonic()
-            
-            return True
-        except Exception as e:
-            print(f"Failed to play effect {effect_name}: {e}")
-            self._close_current_effect_file()
-            return False
+        return True
     
     def play_idle_sound(self):
         """Play the idle hum sound in a loop"""
-        # Open idle sound file if not already open
-        if self.idle_sound is None:
-            try:
-                self.idle_sound = open('sounds/idle.wav', 'rb')
-                print("Opened idle sound file")
-            except Exception as e:
-                print(f"Failed to open idle sound file: {e}")
+        if self.idle_wave is None:
+            # Not loaded at startup - try again so a missing file doesn't stay fatal
+            self.idle_wave = self._load_wave('idle')
+            if self.idle_wave is None:
                 return
         
         # Play with looping - audio module handles the looping internally
-        try:
-            self.play_wav(self.idle_sound, loop=True)
+        self._commands.append((self.idle_wave, True))
+        self._idle_looping = True
+        if _DEBUG:
             print("Playing idle sound")
-        except Exception as e:
-            print(f"Failed to play idle sound: {e}")
 
-    def _ensure_idle_file_open(self):
-        """Ensure the idle sound file is open without starting playback"""
-        if self.idle_sound is None:
-            try:
-                self.idle_sound = open('sounds/idle.wav', 'rb')
-                
-            except Exception as e:
-                print(f"Failed to open idle sound file (ensure): {e}")
-    
-    def _close_idle_file(self):
-        """Close the idle sound file if open"""
-        if self.idle_sound:
-            try:
-                self.idle_sound.close()
-                print("Closed idle sound file")
-            except Exception as e:
-                print(f"Error closing idle sound file: {e}")
-            finally:
-                self.idle_sound = None
-    
     def play_power_on_sound(self):
         """Play the power on sound"""
         return self.play_wav_filename('on')
@@ -175,255 +329,202 @@ class SoundManager:
         """Play the power off sound"""
         return self.play_wav_filename('off')
     
-    def play_swing_sound(self):
-        """Play the swing sound"""
-        return self.play_effect('swing')
-    
-    def play_hit_sound(self):
-        """Play the hit sound"""
-        return self.play_effect('hit')
+    def service_audio(self):
+        """
+        Execute the queued audio commands, oldest first; call from the main loop
+        after process_tick. Nothing reaches AudioOut until this runs, so play and
+        stop calls made between ticks take effect at the next call
+        """
+        commands = self._commands
+        while commands:
+            wave, loop = commands.popleft()
+            if wave is None:
+                if self._audio_running:
+                    self.audio.stop()
+                    self._audio_running = False
+                continue
+            try:
+                self.audio.play(wave, loop=loop)
+                self._audio_running = True
+            except Exception as e:
+                print(f"Failed to play sound: {e}")
+                # Whatever was queued (possibly the hum) isn't playing now
+                self._idle_looping = False
     
     def is_playing(self):
         """Check if any sound is currently playing"""
-        try:
-            return self.audio.playing
-        except Exception:
-            return False
+        return self.audio.playing
     
-    def _handle_activation_state(self, new_state, power_state_machine):
-        """Handle sound behavior for ACTIVATING state with state lock management"""
-        # Pre-open idle file so it remains available during ACTIVE/IDLE
-        self._ensure_idle_file_open()
-        # Get the activation sound effects list
-        activation_effects = config.SOUND_EFFECTS.get('activating', [])
-        if not activation_effects:
-            print("No activation sound effects configured")
+    def _handle_transition_state(self, new_state, power_state_machine):
+        """Handle sound behavior for ACTIVATING/DEACTIVATING, holding the state lock until the sound's duration is reached"""
+        category, lock = self._transition_sounds[new_state.power_state]
+        effects = self._effects.get(category, ())
+        if not effects:
+            print("No " + category + " sound effects configured")
             return
         
-        # Create and add state lock for activation sound if not already created
-        if self.activation_lock is None:
-            # Use the duration of the first activation sound effect
-            activation_duration = activation_effects[0][1]
-            self.activation_lock = StateLock(
-                name="activation_sound",
-                blocked=True,
-                timeout=activation_duration + 0.5,  # Add small buffer to prevent race conditions
-                valid_states=[power_state_machine.ACTIVATING]
-            )
-            power_state_machine.add_state_lock(self.activation_lock)
-            print("Created activation sound state lock")
-
-        if self.activation_lock.blocked:
-            # Start playing first activation sound if not already playing
-            if self.effect_sound is None and not self.is_playing():
-                # Reset playlist to beginning for activation
-                new_state.reset_sound_playlist('activating')
-                filename, duration = new_state.get_current_sound_effect(activation_effects, 'activating')
+        # The lock is armed on entry to the state in _check_transition
+        if lock.blocked:
+            # One clock read serves both starting the sound and the completion check
+            now = time.monotonic_ns()
+            # Start playing the first sound if not already started; the entry
+            # transition stopped whatever was playing before
+            if self.effect_name is None:
+                # Transition sounds always start from the beginning of their playlist
+                filename, duration = effects[0]
                 if filename:
-                    self.play_effect_from_playlist(filename, duration, new_state)
-                    print("Started activation sound")
+                    self.play_effect_from_playlist(filename, duration, now)
+                    if _DEBUG:
+                        print("Started " + category + " sound")
+                else:
+                    print("ERROR: No " + category + " filename returned")
             
-            # Check if current activation sound duration has been reached
-            if self.effect_sound is not None:
+            # Check if the current sound's duration has been reached
+            if self.effect_name is not None and now >= self.sound_end_ns:
+                # Current sound completed - finish the transition
+                self.effect_name = None
+                self.effect_active = False
+                if _DEBUG:
+                    print(category.capitalize() + " sound completed")
                 
-                elapsed = time.monotonic() - self.sound_start_time
-                current_duration = new_state.get_current_sound_duration('activating')
-                
-                if elapsed >= current_duration:
-                    # Current sound completed - finish activation
-                    self.effect_sound = None
-                    print("Activation sound completed")
-                    
-                    # Release the state lock
-                    if self.activation_lock:
-                        self.activation_lock.unlock()
-
-                elif not self.is_playing():
-                    # Sound finished but duration not reached - for activation sounds,
-                    # we don't restart since they should complete based on duration
-                    pass
+                # Release the state lock
+                lock.unlock()
+            # If the sound finished before the duration was reached we don't
+            # restart it, since the transition completes based on duration
     
-    def _handle_deactivation_state(self, new_state, power_state_machine):
-        """Handle sound behavior for DEACTIVATING state with state lock management"""
-        
-        # Get the deactivation sound effects list
-        deactivation_effects = config.SOUND_EFFECTS.get('deactivating', [])
-        
-        if not deactivation_effects:
-            print("No deactivation sound effects configured")
-            return
+    def _handle_effect_state(self, effect, new_state, now):
+        """
+        Start the sound for a HIT or SWING event
+        @param effect: motion effect id to start (_HIT_EFFECT or _SWING_EFFECT)
+        @param now: time.monotonic_ns() read this tick
+        @return: True if the effect sound started
+        """
+        effects = self._motion_effects[effect]
+        if not effects:
+            print("No " + MOTION_EFFECTS[effect] + " sound effects configured")
+            return False
         
-        # Create and add state lock for deactivation sound if not already created
-        if self.deactivation_lock is None:
-            # Use the duration of the first deactivation sound effect
-            deactivation_duration = deactivation_effects[0][1]
-            
-            
-            self.deactivation_lock = StateLock(
-                name="deactivation_sound",
-                blocked=True,
-                timeout=deactivation_duration + 0.5,  # Add small buffer to prevent race conditions
-                valid_states=[power_state_machine.DEACTIVATING]
-            )
-            power_state_machine.add_state_lock(self.deactivation_lock)
-            print("Created deactivation sound state lock")
+        # Start playing the effect sound at the playlist cursor
+        filename, duration = effects[self._cursor[effect]]
+        if filename and self.play_effect_from_playlist(filename, duration, now):
+            if _DEBUG:
+                print("Started " + MOTION_EFFECTS[effect] + " sound")
+            self._current_effect = effect
+            return True
+        return False
+    
+    def _finish_effect(self, effect):
+        """
+        Finish the current hit/swing sound and advance its playlist for the next one
+        @param effect: motion effect id that finished (_HIT_EFFECT or _SWING_EFFECT)
+        """
+        self._cursor[effect] = (self._cursor[effect] + 1) % len(self._motion_effects[effect])
+        self.effect_name = None
+        self.effect_active = False
+        self._current_effect = None
+        if _DEBUG:
+            print(MOTION_EFFECTS[effect].capitalize() + " sound completed")
 
-        
-        
-        
-        
-        if self.deactivation_lock.blocked:
-            # Start playing first deactivation sound if not already playing
-            if self.effect_sound is None and not self.is_playing():
-                
-                # Reset playlist to beginning for deactivation
-                new_state.reset_sound_playlist('deactivating')
-                filename, duration = new_state.get_current_sound_effect(deactivation_effects, 'deactivating')
-                
-                
-                if filename:
-                    self.play_effect_from_playlist(filename, duration, new_state)
-                    print("Started deactivation sound")
-                    
-                else:
-                    print("ERROR: No deactivation filename returned")
-            else:
-                pass
-            
-            # Check if current deactivation sound duration has been reached
-            if self.effect_sound is not None:
-                elapsed = time.monotonic() - self.sound_start_time
-                current_duration = new_state.get_current_sound_duration('deactivating')
-                
-                
-                if elapsed >= current_duration:
-                    # Current sound completed - finish deactivation
-                    self.effect_sound = None
-                    print("Deactivation sound completed")
-                    
-                    # Release the state lock
-                    if self.deactivation_lock:
-                        self.deactivation_lock.unlock()
+    def _resume_idle_sound(self):
+        """Start the idle hum once whatever is playing (e.g. the tail of the activation sound) has finished"""
+        if not self.is_playing():
+            self.play_idle_sound()
 
-                elif not self.is_playing():
-                    # Sound finished but duration not reached - for deactivation sounds,
-                    # we don't restart since they should complete based on duration
-                    pass
-    
-    def _handle_hit_state(self, new_state):
-        """Handle sound behavior for HIT state"""
-        hit_effects = config.SOUND_EFFECTS.get('hit', [])
-        if not hit_effects:
-            print("No hit sound effects configured")
+    def _handle_active_state(self, new_state, power_state_machine):
+        """Handle sound behavior for ACTIVE and IDLE states (motion effects and idle hum)"""
+        # Read the tick's motion events once and test bits instead of calling has_event
+        events = new_state.events_mask & MOTION_START_BITS
+        effect = self._current_effect
+        if effect is None:
+            if not events:
+                # Steady state: keep the hum going, which costs nothing while it loops
+                if not self._idle_looping:
+                    self._resume_idle_sound()
+                return
+        elif effect == _HIT_EFFECT or not events & HIT_START_BIT:
+            # An effect is running and only a hit may interrupt a swing. Effects
+            # finish on their scheduled end time rather than by polling the audio
+            if time.monotonic_ns() < self.sound_end_ns:
+                return
+            self._finish_effect(effect)
+            self.play_idle_sound()
             return
         
-        if self.effect_sound is None or self.effect_sound[0] not in [effect[0] for effect in hit_effects]:
-            # Start playing hit sound from playlist
-            new_state.reset_sound_playlist('hit')
-            filename, duration = new_state.get_current_sound_effect(hit_effects, 'hit')
-            if filename:
-                self.play_effect_from_playlist(filename, duration, new_state)
-                print("Started hit sound")
-        elif self.effect_sound is not None:
-            # Check if hit sound has finished playing
-            if not self.is_playing():
-                # Hit sound completed - advance to next for next hit
-                new_state.advance_sound_playlist(hit_effects, 'hit')
-                self.effect_sound = None
-                print("Hit sound completed")
+        # Start the new effect; a hit takes priority over a swing
+        now = time.monotonic_ns()
+        if events & HIT_START_BIT:
+            started = self._handle_effect_state(_HIT_EFFECT, new_state, now)
+        else:
+            started = self._handle_effect_state(_SWING_EFFECT, new_state, now)
+        if not started and self._current_effect is None and not self._idle_looping:
+            self._resume_idle_sound()
+    
+    def _handle_silent_state(self, new_state, power_state_machine):
+        """Handle sound behavior for states without audio (BOOTING, SLEEPING, WAKING)"""
+        if self.is_playing():
+            self.stop_sound()
+    
+    def _build_state_handlers(self, power_state_machine):
+        """Build the power state -> sound handler dispatch table"""
+        self._state_handlers = {
+            power_state_machine.ACTIVATING: self._handle_transition_state,
+            power_state_machine.DEACTIVATING: self._handle_transition_state,
+            power_state_machine.ACTIVE: self._handle_active_state,
+            power_state_machine.IDLE: self._handle_active_state
+        }
     
-    def _handle_swing_state(self, new_state):
-        """Handle sound behavior for SWING state"""
-        swing_effects = config.SOUND_EFFECTS.get('swing', [])
-        if not swing_effects:
-            print("No swing sound effects configured")
+    def _check_transition(self, new_state, power_state_machine):
+        """Handle entering and leaving ACTIVATING/DEACTIVATING"""
+        power_state = new_state.power_state
+        old_power_state = self._prev_power_state
+        if power_state == old_power_state:
             return
+        self._prev_power_state = power_state
         
-        if self.effect_sound is None or self.effect_sound[0] not in [effect[0] for effect in swing_effects]:
-            # Start playing swing sound from playlist
-            new_state.reset_sound_playlist('swing')
-            filename, duration = new_state.get_current_sound_effect(swing_effects, 'swing')
-            if filename:
-                self.play_effect_from_playlist(filename, duration, new_state)
-                print("Started swing sound")
-        elif self.effect_sound is not None:
-            # Check if swing sound has finished playing
-            if not self.is_playing():
-                # Swing sound completed - advance to next for next swing
-                new_state.advance_sound_playlist(swing_effects, 'swing')
-                self.effect_sound = None
-                print("Swing sound completed")
-
-    def process_tick(self, old_state, new_state, power_state_machine, saber_led_manager=None):
-        """Process one tick of sound management based on state transitions"""
-
-        if new_state.power_state == power_state_machine.ACTIVATING:
-            # Stop any currently playing sound when transitioning TO ACTIVATING
-            if old_state.power_state != power_state_machine.ACTIVATING and self.is_playing():
-                
-                self.stop_sound()
-                self.effect_sound = None
-            self._handle_activation_state(new_state, power_state_machine)
-            return new_state
-        elif (old_state.power_state == power_state_machine.ACTIVATING and 
-            new_state.power_state != power_state_machine.ACTIVATING and 
-            self.activation_lock):
-            # Clean up activation lock if transitioning away from ACTIVATING
-            print("Transitioning away from ACTIVATING - cleaning up activation lock")
-            self.activation_lock.unlock()
-            power_state_machine.remove_state_lock("activation_sound")
-            self.activation_lock = None
+        leaving = self._transition_sounds.get(old_power_state)
+        if leaving is not None and leaving[1] is not None:
+            # Clean up the sound lock when transitioning away from ACTIVATING/DEACTIVATING
+            lock = leaving[1]
+            if _DEBUG:
+                print("Transitioning to " + new_state.power_state_name + " - cleaning up " + lock.name + " lock")
+            lock.unlock()
+            power_state_machine.remove_state_lock_obj(lock)
         
-        if new_state.power_state == power_state_machine.DEACTIVATING:
-            # Stop any currently playing sound when transitioning TO DEACTIVATING
-            if old_state.power_state != power_state_machine.DEACTIVATING and self.is_playing():
-                
+        entering = self._transition_sounds.get(power_state)
+        if entering is not None:
+            # Stop any currently playing sound when transitioning TO ACTIVATING/DEACTIVATING
+            if self.is_playing():
                 self.stop_sound()
-                self.effect_sound = None
-            # Close idle file at start of deactivation so it can be reopened on next activation
-            self._close_idle_file()
-            
-            self._handle_deactivation_state(new_state, power_state_machine)
-            return new_state
-        elif (old_state.power_state == power_state_machine.DEACTIVATING and 
-            new_state.power_state != power_state_machine.DEACTIVATING and 
-            self.deactivation_lock):
-            # Clean up deactivation lock if transitioning away from DEACTIVATING
-            print("Transitioning away from DEACTIVATING - cleaning up deactivation lock")
-            self.deactivation_lock.unlock()
-            power_state_machine.remove_state_lock("deactivation_sound")
-            self.deactivation_lock = None
-
-        if new_state.power_state == power_state_machine.ACTIVE or new_state.power_state == power_state_machine.IDLE:
-            # Handle motion events in ACTIVE and IDLE states
-            if new_state.has_event(new_state.HIT_START) or (self.effect_sound and self.effect_sound[0] == 'hit'):
-                self._handle_hit_state(new_state)
-            elif new_state.has_event(new_state.SWING_START) or (self.effect_sound and self.effect_sound[0] == 'swing'):
-                self._handle_swing_state(new_state)
-
-            # Update effect_sound playing status
-            if self.effect_sound is not None:
-                effect_name, _ = self.effect_sound
-                if not self.is_playing():
-                    # Effect finished playing
-                    self.effect_sound = (effect_name, False)
+            self.effect_name = None
+            self.effect_active = False
+            self._current_effect = None
             
-            # Play idle sound if no effect is playing
-            if self.effect_sound is None or not self.effect_sound[1]:
-                if not self.is_playing():
-                    # Always use the persistent idle file for hum
-                    self.play_idle_sound()
+            # Re-arm the prebuilt sound lock so the transition waits for the sound
+            lock = entering[1]
+            if lock is not None:
+                lock.lock()
+                power_state_machine.add_state_lock(lock)
 
-        if self.is_playing() and new_state.power_state not in [power_state_machine.ACTIVATING, 
-            power_state_machine.ACTIVE, power_state_machine.IDLE, 
-            power_state_machine.DEACTIVATING]:
-            # SLEEPING: Silent (only stop if transitioning TO sleeping)
-            self.stop_sound()
+    def process_tick(self, old_state, new_state, power_state_machine, saber_led_manager=None):
+        """Process one tick of sound management based on state transitions"""
+        self._check_transition(new_state, power_state_machine)
+        
+        # Dispatch to the handler for the current power state (silent if none).
+        # Handlers rely on scheduled end times and the idle loop flag rather
+        # than reading audio.playing every tick
+        handler = self._state_handlers.get(new_state.power_state, self._handle_silent_state)
+        handler(new_state, power_state_machine)
         
         return new_state
     
     def cleanup(self):
         """Clean up resources when shutting down"""
         self.stop_sound()
-        self._close_current_effect_file()
-        self._close_idle_file()
\ No newline at end of file
+        self.service_audio()
+        for name, sample in self._ram_waves.items():
+            if name not in self._wave_cache:
+                sample.deinit()
+        self._ram_waves.clear()
+        for wave in self._wave_cache.values():
+            wave.deinit()
+        self._wave_cache.clear()
\ No newline at end of file
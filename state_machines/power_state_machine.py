@@ -3,51 +3,103 @@
 import time
 import alarm
 import config
+from micropython import const
 from .state_machine_base import StateMachineBase
 
-class PowerStateMachineState:
-    BOOTING = 0
-    SLEEPING = 1
-    WAKING = 2
-    ACTIVATING = 3
-    ACTIVE = 4
-    IDLE = 5
-    DEACTIVATING = 6
+# Set to 1 to print power state debug messages (see state_machine_base._DEBUG)
+_DEBUG = const(0)
 
-    state_names = {
-        BOOTING: "BOOTING",
-        SLEEPING: "SLEEPING",
-        WAKING: "WAKING",
-        ACTIVATING: "ACTIVATING", 
-        ACTIVE: "ACTIVE",
-        IDLE: "IDLE",
-        DEACTIVATING: "DEACTIVATING"
-    }
+# Power states as underscore consts so this module's own comparisons compile to
+# literals; PowerStateMachine re-exports them as class attributes for other modules
+_BOOTING = const(0)
+_SLEEPING = const(1)
+_WAKING = const(2)
+_ACTIVATING = const(3)
+_ACTIVE = const(4)
+_IDLE = const(5)
+_DEACTIVATING = const(6)
 
-    def get_state_name(state):
-        """Get the name of a power state"""
-        return PowerStateMachineState.state_names.get(state, f"UNKNOWN({state})")
+# Valid power state transitions as one bitmask of target states per source
+# state, indexed by the source state, so checking a transition allocates nothing
+_VALID_TRANSITIONS = (
+    1 << _SLEEPING,                         # BOOTING
+    1 << _WAKING,                           # SLEEPING
+    1 << _ACTIVATING,                       # WAKING
+    1 << _ACTIVE,                           # ACTIVATING
+    (1 << _IDLE) | (1 << _DEACTIVATING),    # ACTIVE
+    (1 << _ACTIVE) | (1 << _DEACTIVATING),  # IDLE
+    1 << _SLEEPING                          # DEACTIVATING
+)
+
+# State each auto-transitioning state moves to once the managers have seen a
+# tick in it, indexed by state (None: state doesn't auto-transition)
+_AUTO_TRANSITION_TARGETS = (
+    _SLEEPING,      # BOOTING
+    None,           # SLEEPING
+    _ACTIVATING,    # WAKING
+    _ACTIVE,        # ACTIVATING - locks will block until the effects finish
+    None,           # ACTIVE
+    None,           # IDLE
+    _SLEEPING       # DEACTIVATING - locks will block until the effects finish
+)
+
+# State a power button press moves to, indexed by the current state (None: no action)
+_BUTTON_PRESS_TARGETS = (
+    None,           # BOOTING
+    _WAKING,        # SLEEPING - start wake sequence
+    None,           # WAKING
+    None,           # ACTIVATING
+    _DEACTIVATING,  # ACTIVE - start deactivation sequence
+    _DEACTIVATING,  # IDLE - start deactivation sequence
+    None            # DEACTIVATING
+)
+
+# Power state names indexed by state, since the states are dense small ints;
+# the one tuple of name strings shared by every lookup
+POWER_STATE_NAMES = ("BOOTING", "SLEEPING", "WAKING", "ACTIVATING", "ACTIVE", "IDLE", "DEACTIVATING")
+
+def get_power_state_name(state):
+    """Get the name of a power state without needing a PowerStateMachine instance"""
+    if 0 <= state < len(POWER_STATE_NAMES):
+        return POWER_STATE_NAMES[state]
+    return f"UNKNOWN({state})"
 
 class PowerStateMachine(StateMachineBase):
     """Power state machine managing lightsaber power states"""
     
+    # Define slots for memory efficiency and faster attribute access
+    __slots__ = (
+        'logging_manager', '_last_logged_state', '_last_published_state',
+        'led_animation_complete', 'sound_animation_complete', 'inactivity_timer',
+        '_idle_timeout', '_auto_shutdown_timeout', '_deep_sleep_timeout',
+        'waking_start_time', 'waking_duration', '_waking_initialized',
+        'state_names'
+    )
+    
     # Power states
-    BOOTING = 0
-    SLEEPING = 1
-    WAKING = 2
-    ACTIVATING = 3
-    ACTIVE = 4
-    IDLE = 5
-    DEACTIVATING = 6
+    BOOTING = _BOOTING
+    SLEEPING = _SLEEPING
+    WAKING = _WAKING
+    ACTIVATING = _ACTIVATING
+    ACTIVE = _ACTIVE
+    IDLE = _IDLE
+    DEACTIVATING = _DEACTIVATING
+    
+    # Power state transition rules and names, used by StateMachineBase
+    ALLOWED_TRANSITIONS = _VALID_TRANSITIONS
+    STATE_NAMES = POWER_STATE_NAMES
     
     def __init__(self, logging_manager=None):
         """Initialize the power state machine"""
-        super().__init__()
+        super().__init__(len(POWER_STATE_NAMES))
         self.logging_manager = logging_manager
-        self._last_logged_state = self.BOOTING
+        self._last_logged_state = _BOOTING
+        # Power state last written into LightsaberState; the state object is
+        # copied tick to tick, so it only needs writing again when this changes
+        self._last_published_state = None
         
         # Initialize to BOOTING state
-        self.current_state = self.BOOTING
+        self.current_state = _BOOTING
         self.state_start_time = time.monotonic()
         
         # Animation completion tracking
@@ -57,115 +109,108 @@ class PowerStateMachine(StateMachineBase):
         # Inactivity tracking
         self.inactivity_timer = 0.0
         
+        # Timeouts read out of config once so the tick doesn't repeat the module lookups
+        self._idle_timeout = config.IDLE_TIMEOUT
+        self._auto_shutdown_timeout = config.AUTO_SHUTDOWN_TIMEOUT
+        self._deep_sleep_timeout = config.DEEP_SLEEP_TIMEOUT
+        
         
         # WAKING state tracking
         self.waking_start_time = 0.0
         self.waking_duration = config.WAKING_DURATION  # Delay for WAKING state to stabilize
         self._waking_initialized = False
         
-        # State names for debugging
-        self.state_names = {
-            self.BOOTING: "BOOTING",
-            self.SLEEPING: "SLEEPING",
-            self.WAKING: "WAKING",
-            self.ACTIVATING: "ACTIVATING", 
-            self.ACTIVE: "ACTIVE",
-            self.IDLE: "IDLE",
-            self.DEACTIVATING: "DEACTIVATING"
-        }
+        # State names for debugging, indexed by state
+        self.state_names = POWER_STATE_NAMES
         
         # Initialize inactivity timer
         self.update_inactivity_timer()
-    
-    def get_state_name(self, state):
-        """Get the name of a power state"""
-        return self.state_names.get(state, f"UNKNOWN({state})")
-    
-    def can_transition_to(self, target_state):
-        """Check if transition to target state is valid based on power state rules"""
-        current = self.current_state
-        
-        # Define valid transitions
-        valid_transitions = {
-            self.BOOTING: [self.SLEEPING],
-            self.SLEEPING: [self.WAKING],
-            self.WAKING: [self.ACTIVATING],
-            self.ACTIVATING: [self.ACTIVE],
-            self.ACTIVE: [self.IDLE, self.DEACTIVATING],
-            self.IDLE: [self.ACTIVE, self.DEACTIVATING],
-            self.DEACTIVATING: [self.SLEEPING]
-        }
         
-        return target_state in valid_transitions.get(current, [])
+        # Per-state tick work, run by dispatch_update() in process_tick
+        self.add_state_update_handler(_ACTIVE, self._update_active)
+        self.add_state_update_handler(_IDLE, self._update_idle)
+        for state, target in enumerate(_AUTO_TRANSITION_TARGETS):
+            if target is not None:
+                self.add_state_update_handler(state, self._update_auto_transition)
     
-    def check_inactivity_timeout(self):
-        """Check if inactivity timeout reached for deep sleep transition"""
-        if self.current_state == self.SLEEPING:
-            if time.monotonic() - self.inactivity_timer > config.DEEP_SLEEP_TIMEOUT:
+    def check_inactivity_timeout(self, now=None):
+        """
+        Check if inactivity timeout reached for deep sleep transition
+        @param now: time.monotonic() already read this tick, if the caller has one
+        """
+        if self.current_state == _SLEEPING:
+            if now is None:
+                now = time.monotonic()
+            if now - self.inactivity_timer > self._deep_sleep_timeout:
                 return True
         return False
     
-    def update_inactivity_timer(self):
-        """Update the inactivity timer (call when activity is detected)"""
-        self.inactivity_timer = time.monotonic()
+    def update_inactivity_timer(self, now=None):
+        """
+        Update the inactivity timer (call when activity is detected)
+        @param now: time.monotonic() already read this tick, if the caller has one
+        """
+        self.inactivity_timer = time.monotonic() if now is None else now
 
     
     def handle_power_button_press(self):
         """Handle power button press based on current state"""
-        print(f"handle_power_button_press called with current_state: {self.get_state_name(self.current_state)}")
-        if self.current_state == self.SLEEPING:
-            # Start wake sequence
-            print("Starting wake sequence from SLEEPING")
-            self.transition_to(self.WAKING)
-        elif self.current_state == self.ACTIVE or self.current_state == self.IDLE:
-            # Start deactivation sequence
-            print("Starting deactivation sequence from ACTIVE/IDLE")
-            self.transition_to(self.DEACTIVATING)
-        else:
+        if _DEBUG:
+            print(f"handle_power_button_press called with current_state: {self.get_state_name(self.current_state)}")
+        target = _BUTTON_PRESS_TARGETS[self.current_state]
+        if target is not None:
+            if _DEBUG:
+                print(f"Starting {self.get_state_name(target)} from {self.get_state_name(self.current_state)}")
+            self.transition_to(target)
+        elif _DEBUG:
             print(f"No action taken for power button press in state: {self.get_state_name(self.current_state)}")
     
-    def handle_motion_detected(self):
-        """Handle motion detection based on current state"""
-        if self.current_state == self.IDLE:
+    def handle_motion_detected(self, now=None):
+        """
+        Handle motion detection based on current state
+        @param now: time.monotonic() already read this tick, if the caller has one
+        """
+        if self.current_state == _IDLE:
             # Return to active state
-            self.transition_to(self.ACTIVE)
-        elif self.current_state == self.ACTIVE:
+            self.transition_to(_ACTIVE)
+        elif self.current_state == _ACTIVE:
             # Update state start time to reset idle timeout
-            self.state_start_time = time.monotonic()
-        elif self.current_state == self.SLEEPING:
+            self.state_start_time = time.monotonic() if now is None else now
+        elif self.current_state == _SLEEPING:
             # Update inactivity timer
-            self.update_inactivity_timer()
+            self.update_inactivity_timer(now)
     
     def handle_no_motion_timeout(self):
         """Handle no motion timeout based on current state"""
-        if self.current_state == self.ACTIVE:
+        if self.current_state == _ACTIVE:
             # Transition to idle state
-            self.transition_to(self.IDLE)
+            self.transition_to(_IDLE)
     
     def handle_idle_auto_shutdown_timeout(self):
         """Handle auto-shutdown timeout when device has been IDLE for too long"""
-        if self.current_state == self.IDLE:
+        if self.current_state == _IDLE:
             # Transition to deactivating state for auto-shutdown
-            self.transition_to(self.DEACTIVATING)
+            self.transition_to(_DEACTIVATING)
 
-    def _handle_auto_transition(self):
-        # Update power state machine
-        if self.current_state == self.BOOTING:
-            print("Transitioning from BOOTING to SLEEPING")
-            self.transition_to(self.SLEEPING)
-        
-        # Handle WAKING state auto-transition to ACTIVATING
-        elif self.current_state == self.WAKING:
-            self.transition_to(self.ACTIVATING)
-
-        #auto-transition to ACTIVE from ACTIVATING, locks will block if needed
-        elif self.current_state == self.ACTIVATING :
-            self.transition_to(self.ACTIVE)
-        
-        #auto-transition to SLEEPING from DEACTIVATING, locks will block if needed
-        elif self.current_state == self.DEACTIVATING:
-            self.transition_to(self.SLEEPING)
+    def _update_active(self):
+        """Handle no motion timeout (transition from ACTIVE to IDLE)"""
+        if time.monotonic() - self.state_start_time > self._idle_timeout:
+            self.handle_no_motion_timeout()
+    
+    def _update_idle(self):
+        """Handle idle auto-shutdown timeout (transition from IDLE to DEACTIVATING)"""
+        if time.monotonic() - self.state_start_time > self._auto_shutdown_timeout:
+            self.handle_idle_auto_shutdown_timeout()
     
+    def _update_auto_transition(self):
+        """Move on from a transient state once the managers have seen a tick in it"""
+        state = self.current_state
+        if state == self._last_logged_state:
+            target = _AUTO_TRANSITION_TARGETS[state]
+            if _DEBUG:
+                print(f"Transitioning from {self.get_state_name(state)} to {self.get_state_name(target)}")
+            self.transition_to(target)
+
     def process_tick(self, old_state, new_state):
         """Process one tick of power state machine and handle power-related events"""
         # Check for pending transitions first
@@ -179,40 +224,37 @@ class PowerStateMachine(StateMachineBase):
         if new_state.has_event(new_state.SWING_START) or new_state.has_event(new_state.HIT_START):
             self.handle_motion_detected()
         
-        # Handle no motion timeout (transition from ACTIVE to IDLE)
-        if (self.current_state == self.ACTIVE and 
-            time.monotonic() - self.state_start_time > config.IDLE_TIMEOUT):
-            self.handle_no_motion_timeout()
-        
-        # Handle idle auto-shutdown timeout (transition from IDLE to DEACTIVATING)
-        if (self.current_state == self.IDLE and 
-            time.monotonic() - self.state_start_time > config.AUTO_SHUTDOWN_TIMEOUT):
-            self.handle_idle_auto_shutdown_timeout()
+        # Run only the timeout or auto-transition check for the current state;
+        # only the ACTIVE/IDLE timeout checks read the clock
+        self.dispatch_update()
         
         # Log state transition if it changed
-        if self._last_logged_state == self.current_state:
-            self._handle_auto_transition()
-        else:
-            print(f"Power state transition: {self.get_state_name(self._last_logged_state)} -> {self.get_state_name(self.current_state)}")
+        if self._last_logged_state != self.current_state:
+            if _DEBUG:
+                print(f"Power state transition: {self.get_state_name(self._last_logged_state)} -> {self.get_state_name(self.current_state)}")
             
             # Handle swing_hit_state updates based on power state transitions
             # Set to IDLE when entering ACTIVE from ACTIVATING
-            if (self._last_logged_state == self.ACTIVATING and 
-                self.current_state == self.ACTIVE):
+            if (self._last_logged_state == _ACTIVATING and 
+                self.current_state == _ACTIVE):
                 new_state.swing_hit_state = new_state.IDLE
-                print("Set swing_hit_state to IDLE (entered ACTIVE)")
+                if _DEBUG:
+                    print("Set swing_hit_state to IDLE (entered ACTIVE)")
             
             # Set to OFF when entering DEACTIVATING
-            elif self.current_state == self.DEACTIVATING:
+            elif self.current_state == _DEACTIVATING:
                 new_state.swing_hit_state = new_state.OFF
-                print("Set swing_hit_state to OFF (entered DEACTIVATING)")
+                if _DEBUG:
+                    print("Set swing_hit_state to OFF (entered DEACTIVATING)")
 
             
-         # Update power state in LightsaberState
-        new_state.set_power_state(
-            self.current_state,
-            self.get_state_name(self.current_state)
-        )
+        # Update power state in LightsaberState when it changed
+        if self.current_state != self._last_published_state:
+            new_state.set_power_state(
+                self.current_state,
+                self.get_state_name(self.current_state)
+            )
+            self._last_published_state = self.current_state
         
         self._last_logged_state = self.current_state
         
@@ -1,6 +1,15 @@
 """Base state machine class for the lightsaber"""
 
-import time
+from time import monotonic as _monotonic
+from micropython import const
+
+# Set to 1 to print state machine debug messages. As an underscore const the
+# compiler folds 'if _DEBUG:' away entirely, f-strings and all
+_DEBUG = const(0)
+
+def _noop():
+    """Stand-in for an absent callback inside a transition record"""
+    pass
 
 class StateLock:
     """State lock to prevent state transitions when certain conditions are not met"""
@@ -19,13 +28,13 @@ class StateLock:
         self.blocked = blocked
         self.timeout = timeout
         self.valid_states = valid_states or []
-        self.created_time = time.monotonic()
+        self.created_time = _monotonic()
     
     def is_expired(self):
         """Check if the lock has expired based on timeout"""
         if self.timeout is None:
             return False
-        return time.monotonic() - self.created_time > self.timeout
+        return _monotonic() - self.created_time > self.timeout
     
     def is_valid_for_state(self, state):
         """Check if this lock is valid for the given state"""
@@ -33,24 +42,66 @@ class StateLock:
     
     def unlock(self):
         """Unlock the state lock"""
-        print(f"Unlocking state lock '{self.name}'")
+        if _DEBUG:
+            print(f"Unlocking state lock '{self.name}'")
         self.blocked = False
     
     def lock(self):
-        """Lock the state lock"""
+        """Lock the state lock, restarting its timeout so a lock can be reused"""
         self.blocked = True
+        self.created_time = _monotonic()
 
 class StateMachineBase:
     """Base class for all state machines in the lightsaber system"""
     
-    def __init__(self):
-        """Initialize the base state machine"""
+    # Define slots for memory efficiency and faster attribute access;
+    # subclasses declare their own attributes the same way
+    __slots__ = (
+        'current_state', 'previous_state', 'state_start_time',
+        'num_states', 'state_entry_callbacks', 'state_exit_callbacks',
+        'transition_callbacks', '_transition_records', 'state_update_handlers',
+        'state_locks', 'pending_transition'
+    )
+    
+    # Valid transitions as a tuple of target-state bitmasks indexed by source
+    # state, (1 << target) set for each allowed target; None allows everything.
+    # Subclasses set this instead of overriding can_transition_to
+    ALLOWED_TRANSITIONS = None
+    
+    # State names indexed by state for get_state_name; None falls back to str(state)
+    STATE_NAMES = None
+    
+    # Whether transitions record previous_state; nothing reads it by default, so
+    # subclasses that need it opt in rather than every transition paying the store
+    TRACK_PREVIOUS = False
+    
+    def __init__(self, num_states=0):
+        """
+        Initialize the base state machine
+        @param num_states: number of states; states are small ints used to
+                           index the per-state callback slots
+        """
         self.current_state = None
         self.previous_state = None
+        # time.monotonic() of the last transition. A float, since on CircuitPython
+        # monotonic_ns() values are heap-allocated long ints; monotonic() loses
+        # resolution over long uptimes, which second-scale timeouts tolerate
         self.state_start_time = 0.0
-        self.transition_callbacks = {}
-        self.state_entry_callbacks = {}
-        self.state_exit_callbacks = {}
+        # Callback slots are plain lists indexed by state, None where no
+        # callback is registered, so dispatching one is an index, not a hash.
+        # States outside 0..num_states-1 can't have callbacks
+        self.num_states = num_states
+        self.state_entry_callbacks = [None] * num_states
+        self.state_exit_callbacks = [None] * num_states
+        # Transition callbacks in one flat table indexed by previous * num_states + new
+        self.transition_callbacks = [None] * (num_states * num_states)
+        # Per state pair, the resolved (exit, entry, transition) callbacks in the
+        # same flat layout with _noop filling absent ones, or None when the pair
+        # has no callbacks at all; rebuilt on registration so a transition does
+        # one index and one None test
+        self._transition_records = [None] * (num_states * num_states)
+        # Per-tick update handlers indexed by state, run by dispatch_update()
+        self.state_update_handlers = [None] * num_states
         
         # State lock system
         self.state_locks = []
@@ -63,11 +114,13 @@ class StateMachineBase:
         @return: True if transition was successful, False otherwise
         """
         if not self.can_transition_to(new_state):
-            print(f"Invalid transition from {self.current_state} to {new_state}")
+            if _DEBUG:
+                print(f"Invalid transition from {self.current_state} to {new_state}")
             return False
         
-        # Check if any state locks are blocking the transition
-        if self._are_locks_blocking_transition():
+        # Check if any state locks are blocking the transition; with no locks
+        # registered (the common case) this skips the method call entirely
+        if self.state_locks and self._are_locks_blocking_transition():
             self.pending_transition = new_state
             return False
         
@@ -76,28 +129,36 @@ class StateMachineBase:
     
     def _execute_transition(self, new_state):
         """Execute the actual state transition"""
-        # Execute exit callback for current state
-        if self.current_state is not None and self.current_state in self.state_exit_callbacks:
-            self.state_exit_callbacks[self.current_state]()
+        previous_state = self.current_state
+        num_states = self.num_states
+        if previous_state is not None and previous_state < num_states and new_state < num_states:
+            record = self._transition_records[previous_state * num_states + new_state]
+        else:
+            # Leaving the initial None state or an unindexed state
+            record = self._build_transition_record(previous_state, new_state)
+        
+        # Execute exit callback for current state; absent callbacks in a record
+        # are _noop, so only the record itself needs a test
+        if record is not None:
+            exit_callback, entry_callback, transition_callback = record
+            exit_callback()
         
         # Update state
-        self.previous_state = self.current_state
+        if self.TRACK_PREVIOUS:
+            self.previous_state = previous_state
         self.current_state = new_state
-        self.state_start_time = time.monotonic()
+        self.state_start_time = _monotonic()
         
         # Clear pending transition
         self.pending_transition = None
         
-        # Execute entry callback for new state
-        if new_state in self.state_entry_callbacks:
-            self.state_entry_callbacks[new_state]()
+        if record is not None:
+            # Execute entry callback for new state, then the transition callback
+            entry_callback()
+            transition_callback()
         
-        # Execute transition callback
-        transition_key = (self.previous_state, new_state)
-        if transition_key in self.transition_callbacks:
-            self.transition_callbacks[transition_key]()
-        
-        print(f"State transition: {self.previous_state} -> {new_state}")
+        if _DEBUG:
+            print(f"State transition: {previous_state} -> {new_state}")
         return True
     
     def can_transition_to(self, target_state):
@@ -106,16 +167,84 @@ class StateMachineBase:
         @param target_state: The state to transition to
         @return: True if transition is valid, False otherwise
         """
-        # Override in subclasses to implement specific transition rules
-        return True
+        allowed = self.ALLOWED_TRANSITIONS
+        current_state = self.current_state
+        # No table, or no state yet: the initial transition is unrestricted
+        if allowed is None or current_state is None:
+            return True
+        return bool((allowed[current_state] >> target_state) & 1)
+    
+    def _build_transition_record(self, previous_state, new_state):
+        """
+        Resolve the callbacks for one transition
+        @return: (exit, entry, transition) callbacks, _noop where absent, or
+                 None if the transition has no callbacks at all
+        """
+        num_states = self.num_states
+        has_previous = previous_state is not None and 0 <= previous_state < num_states
+        has_new = 0 <= new_state < num_states
+        exit_callback = self.state_exit_callbacks[previous_state] if has_previous else None
+        entry_callback = self.state_entry_callbacks[new_state] if has_new else None
+        transition_callback = None
+        if has_previous and has_new:
+            transition_callback = self.transition_callbacks[previous_state * num_states + new_state]
+        if exit_callback is None and entry_callback is None and transition_callback is None:
+            return None
+        return (exit_callback or _noop, entry_callback or _noop, transition_callback or _noop)
+    
+    def _rebuild_transition_records(self):
+        """Re-resolve the per-pair transition records after a callback changes"""
+        num_states = self.num_states
+        records = self._transition_records
+        for previous_state in range(num_states):
+            for new_state in range(num_states):
+                records[previous_state * num_states + new_state] = self._build_transition_record(previous_state, new_state)
+    
+    def _check_state_index(self, state):
+        """Raise ValueError unless state can index the callback slots"""
+        if not 0 <= state < self.num_states:
+            raise ValueError(f"State {state} out of range for {self.num_states} states")
     
     def add_state_entry_callback(self, state, callback):
         """Add a callback to be called when entering a state"""
+        self._check_state_index(state)
         self.state_entry_callbacks[state] = callback
+        self._rebuild_transition_records()
+    
+    def add_state_exit_callback(self, state, callback):
+        """Add a callback to be called when leaving a state"""
+        self._check_state_index(state)
+        self.state_exit_callbacks[state] = callback
+        self._rebuild_transition_records()
+    
+    def add_transition_callback(self, from_state, to_state, callback):
+        """Add a callback to be called on a transition from one state to another"""
+        self._check_state_index(from_state)
+        self._check_state_index(to_state)
+        self.transition_callbacks[from_state * self.num_states + to_state] = callback
+        self._rebuild_transition_records()
+    
+    def add_state_update_handler(self, state, handler):
+        """Add a handler that dispatch_update() calls while in a state"""
+        self._check_state_index(state)
+        self.state_update_handlers[state] = handler
+    
+    def dispatch_update(self):
+        """Run the update handler registered for the current state, if any"""
+        state = self.current_state
+        if state is not None and state < self.num_states:
+            handler = self.state_update_handlers[state]
+            if handler is not None:
+                handler()
     
     def get_state_name(self, state):
-        """Get the name of a state (override in subclasses)"""
-        return str(state)
+        """Get the name of a state from STATE_NAMES, without allocating for known states"""
+        names = self.STATE_NAMES
+        if names is None:
+            return str(state)
+        if 0 <= state < len(names):
+            return names[state]
+        return f"UNKNOWN({state})"
     
     def add_state_lock(self, state_lock):
         """
@@ -134,7 +263,8 @@ class StateMachineBase:
         
         # Add the lock
         self.state_locks.append(state_lock)
-        print(f"Added state lock '{state_lock.name}' (blocked={state_lock.blocked})")
+        if _DEBUG:
+            print(f"Added state lock '{state_lock.name}' (blocked={state_lock.blocked})")
         return True
     
     def remove_state_lock(self, lock_name):
@@ -150,13 +280,39 @@ class StateMachineBase:
         for i, lock in enumerate(self.state_locks):
             if lock.name == lock_name:
                 del self.state_locks[i]
-                print(f"Removed state lock '{lock_name}'")
+                if _DEBUG:
+                    print(f"Removed state lock '{lock_name}'")
                 return True
-        print(f"State lock '{lock_name}' not found")
+        if _DEBUG:
+            print(f"State lock '{lock_name}' not found")
+        return False
+    
+    def remove_state_lock_obj(self, state_lock):
+        """
+        Remove a state lock the caller holds, matching by identity instead of name
+        
+        Args:
+            state_lock (StateLock): The state lock to remove
+            
+        Returns:
+            bool: True if lock was found and removed, False otherwise
+        """
+        for i, lock in enumerate(self.state_locks):
+            if lock is state_lock:
+                del self.state_locks[i]
+                if _DEBUG:
+                    print(f"Removed state lock '{state_lock.name}'")
+                return True
+        if _DEBUG:
+            print(f"State lock '{state_lock.name}' not found")
         return False
     
     def _are_locks_blocking_transition(self):
         """Check if any state locks are currently blocking transitions"""
+        # Most transitions happen with no locks registered at all
+        if not self.state_locks:
+            return False
+        
         # Clean up expired locks
         self._cleanup_expired_locks()
         
@@ -168,18 +324,30 @@ class StateMachineBase:
     
     def _cleanup_expired_locks(self):
         """Remove expired state locks"""
-        expired_locks = [lock for lock in self.state_locks if lock.is_expired()]
-        for lock in expired_locks:
-            print(f"State lock '{lock.name}' has expired, removing")
-            self.state_locks.remove(lock)
+        if not self.state_locks:
+            return
+        # Compact the list in place in one pass: live locks are shifted down
+        # over expired ones and the tail is dropped, with no temporary list
+        locks = self.state_locks
+        kept = 0
+        for lock in locks:
+            if lock.is_expired():
+                if _DEBUG:
+                    print(f"State lock '{lock.name}' has expired, removing")
+            else:
+                locks[kept] = lock
+                kept += 1
+        del locks[kept:]
     
     def check_pending_transition(self):
         """
         Check if there's a pending transition that can now be executed
         This should be called from process_tick methods
         """
-        if self.pending_transition is not None:
+        pending_transition = self.pending_transition
+        if pending_transition is not None:
             if not self._are_locks_blocking_transition():
-                print(f"Executing pending transition to {self.pending_transition}")
-                return self._execute_transition(self.pending_transition)
+                if _DEBUG:
+                    print(f"Executing pending transition to {pending_transition}")
+                return self._execute_transition(pending_transition)
         return False
@@ -0,0 +1,80 @@
+"""Tests for the sensor manager's sample-count debouncer"""
+
+import sys
+import types
+import unittest
+
+# sensor_manager imports CircuitPython hardware modules at import time; give
+# the desktop interpreter empty stand-ins for any that aren't installed
+for _name in ('busio', 'board', 'digitalio', 'analogio', 'adafruit_lis3dh', 'config'):
+    if _name not in sys.modules:
+        try:
+            __import__(_name)
+        except Exception:
+            sys.modules[_name] = types.ModuleType(_name)
+for _attr in ('DigitalInOut', 'Direction', 'Pull'):
+    if not hasattr(sys.modules['digitalio'], _attr):
+        setattr(sys.modules['digitalio'], _attr, None)
+if not hasattr(sys.modules['analogio'], 'AnalogIn'):
+    sys.modules['analogio'].AnalogIn = None
+if 'micropython' not in sys.modules:
+    micropython = types.ModuleType('micropython')
+    micropython.const = lambda value: value
+    sys.modules['micropython'] = micropython
+
+from sensor_manager import StableSampleDebouncer
+
+
+def make_debouncer(samples):
+    """Build a debouncer fed from a list the test appends raw samples to"""
+    readings = []
+    debouncer = StableSampleDebouncer(lambda: readings.pop(0), samples=samples)
+    return debouncer, readings
+
+
+def feed(debouncer, readings, values):
+    """Feed raw samples one tick at a time, returning the debounced values"""
+    result = []
+    for value in values:
+        readings.append(value)
+        debouncer.update()
+        result.append(debouncer.value)
+    return result
+
+
+class StableSampleDebouncerTest(unittest.TestCase):
+
+    def test_single_sample_follows_input(self):
+        debouncer, readings = make_debouncer(1)
+        self.assertEqual(feed(debouncer, readings, [True, True, False, True]),
+                         [True, True, False, True])
+
+    def test_single_sample_edges(self):
+        debouncer, readings = make_debouncer(1)
+        feed(debouncer, readings, [True])
+        self.assertTrue(debouncer.rose)
+        self.assertFalse(debouncer.fell)
+        feed(debouncer, readings, [False])
+        self.assertFalse(debouncer.rose)
+        self.assertTrue(debouncer.fell)
+
+    def test_changes_after_n_stable_samples(self):
+        debouncer, readings = make_debouncer(3)
+        self.assertEqual(feed(debouncer, readings, [True, True, True, True]),
+                         [False, False, True, True])
+
+    def test_bounce_restarts_count(self):
+        debouncer, readings = make_debouncer(3)
+        self.assertEqual(feed(debouncer, readings, [True, True, False, True, True, True]),
+                         [False, False, False, False, False, True])
+
+    def test_edges_last_one_tick(self):
+        debouncer, readings = make_debouncer(2)
+        feed(debouncer, readings, [True, True])
+        self.assertTrue(debouncer.rose)
+        feed(debouncer, readings, [True])
+        self.assertFalse(debouncer.rose)
+
+
+if __name__ == '__main__':
+    unittest.main()